@@ -62,10 +62,7 @@ def historical_return_from_to_date(instrument, buy_date, sell_date):
     gain_ratios = []
 
     # use the close price if it exists
-    if 'close' in instrument.data.dtype.names:
-        value_key = 'close'
-    else:
-        value_key = 'value'
+    value_key = instrument.price_field
         
     
     while _sell_date <= last_date:
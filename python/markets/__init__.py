@@ -64,13 +64,22 @@ def get_instruments():
     Get a pickled dict of all instruments in all markets.
     If a market's pickle file isn't found, it will be omitted.
 
+    Return:
+       A dict of instruments indexed by name"""
+    return _get_instruments().copy()
+
+def _get_instruments():
+    """
+    Get the dict of all instruments in all markets, without copying it.
+    The returned dict must not be modified.
+
     Return:
        A dict of instruments indexed by name"""
     global _instruments
 
     # if the dict has already has been created
     if _instruments is not None:
-        return _instruments.copy()
+        return _instruments
 
     # markets to merge
     list_of_markets = []
@@ -99,7 +108,7 @@ def get_instruments():
             else:
                 _instruments[instrument.ticker] = instrument
             
-    return _instruments.copy()
+    return _instruments
 
 def get_instrument(ticker):
     """
@@ -114,7 +123,8 @@ def get_instrument(ticker):
     Raises:
         KeyError: On item not found
     """
-    instruments = get_instruments()
+    # look up the cached dict directly, copying it for every lookup is expensive
+    instruments = _get_instruments()
     return instruments[ticker]
 
 def get_tickers():
@@ -124,7 +134,7 @@ def get_tickers():
     Return:
        A list of str
     """
-    instruments = get_instruments()
+    instruments = _get_instruments()
     tickers = list(instruments)
     tickers.sort()
     return tickers
@@ -164,13 +174,15 @@ def trading_days(from_date, to_date, ticker='OBX.OSE'):
     Yields:
        datetime.date objects
     """
-    trading_days = []
-    date = from_date
+    instrument = get_instrument(ticker)
+
+    # the trading days are the dates with data, find the ones in the interval
+    dates = instrument.get_date_ordinals()
+    start = np.searchsorted(dates, from_date.toordinal(), side='left')
+    stop = np.searchsorted(dates, to_date.toordinal(), side='right')
 
-    while date <= to_date:
-        if is_trading_day(date, ticker):
-            yield date
-        date += datetime.timedelta(days=1)
+    for ordinal in dates[start:stop]:
+        yield datetime.date.fromordinal(int(ordinal))
 
 def trading_days_ago(date, days, ticker='OBX.OSE'):
     """
@@ -1,3 +1,4 @@
+import copy
 import datetime
 import numpy as np
 
@@ -22,12 +23,118 @@ class Instrument(object):
         self.exchange = exchange
         self.data = data
 
+        # the column to use as the closing price.
+        # Typically, Nasdaq OMX data doesn't have 'close', but 'value'
+        self.price_field = self._find_price_field()
+
+        # contiguous copies of data columns and columns derived from them,
+        # indexed by column name
+        self._columns = {}
+
+    def __getstate__(self):
+        # the column copies can be recreated from the data, don't pickle them
+        state = self.__dict__.copy()
+        state.pop('_columns', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._columns = {}
+
+        # instruments pickled by older versions don't have a price field
+        if 'price_field' not in state:
+            self.price_field = self._find_price_field()
+
     def __str__(self):
         return self.ticker
 
     def __repr__(self):
         return self.ticker
 
+    def _find_price_field(self):
+        """
+        Find the name of the column to use as the closing price
+
+        Return:
+           'close' if the data has a 'close' column, else 'value'
+        """
+        if 'close' in self.data.dtype.names:
+            return 'close'
+        else:
+            return 'value'
+
+    def get_view(self, stop):
+        """
+        Get a copy of this instrument which only contains the first rows.
+        The data isn't copied, the copy gets a read-only view of it.
+
+        Args:
+           stop(int): Number of rows to keep
+
+        Return:
+           A shallow copy of the Instrument object
+        """
+        instrument = copy.copy(self)
+        instrument.data = self.data[:stop]
+        instrument.data.flags.writeable = False
+
+        # the column copies which already exist can be shared as views too
+        instrument._columns = {name: column[:stop]
+                               for name, column in self._columns.items()}
+
+        return instrument
+
+    def get_column(self, name, dtype=None):
+        """
+        Get a data column as a contiguous array.
+        Columns in the data matrix are strided, with the other columns
+        in between each value. The contiguous copy is faster to scan,
+        and is only created the first time the column is requested.
+
+        Args:
+           name(str): Column name, for instance 'date' or 'close'
+           dtype: Type to convert the column to, or None to keep the type.
+                  numpy.float32 halves the memory used by long scans,
+                  but use the original float64 for sums and averages.
+
+        Return:
+           Read-only numpy.array
+
+        Raises:
+           ValueError if there is no column with this name
+        """
+        key = name if dtype is None else (name, np.dtype(dtype).name)
+
+        if key not in self._columns:
+            column = np.ascontiguousarray(self.data[name], dtype=dtype)
+            column.flags.writeable = False
+            self._columns[key] = column
+
+        return self._columns[key]
+
+    def get_date_ordinals(self):
+        """
+        Get the dates of all rows as proleptic Gregorian ordinals,
+        the same as datetime.date.toordinal() returns.
+        Integer ordinals are faster to compare than datetime.date objects,
+        and can be searched with numpy.searchsorted()
+
+        Return:
+           Read-only numpy.array of int64
+        """
+        if 'date_ordinal' not in self._columns:
+
+            # The timestamps are local midnight, convert them the same way
+            # as get_first_date() does. This is only done once per instrument.
+            dates = self.get_column('date')
+            ordinals = np.fromiter(
+                (datetime.date.fromtimestamp(t).toordinal() for t in dates),
+                dtype='i8', count=len(dates))
+            ordinals.flags.writeable = False
+            self._columns['date_ordinal'] = ordinals
+
+        return self._columns['date_ordinal']
+
     def get_first_date(self):
         """
         Get the first data item for this instrument
@@ -81,13 +188,12 @@ class Instrument(object):
         Raises:
            KeyError if there is no data for this date
         """
-        # convert to timestamp
-        timestamp = datetime.datetime(
-            date.year, date.month, date.day).timestamp()
-
-        # get matching rows
-        matches = np.where(self.data['date'] == timestamp)[0]
-        match_count = len(matches)
+        # binary search for the matching rows in the sorted dates
+        dates = self.get_date_ordinals()
+        ordinal = date.toordinal()
+        start = np.searchsorted(dates, ordinal, side='left')
+        stop = np.searchsorted(dates, ordinal, side='right')
+        match_count = stop - start
 
         # no matching rows
         if match_count == 0:
@@ -96,7 +202,7 @@ class Instrument(object):
         # if there was exactly one matching row
         elif match_count == 1:
             # get the index of the matching row
-            row_index = matches[0]
+            row_index = int(start)
 
             return row_index
 
@@ -119,12 +225,9 @@ class Instrument(object):
         Raises:
            KeyError if there is no data for this date or earlier dates
         """
-        # convert to timestamp
-        timestamp = datetime.datetime(
-            date.year, date.month, date.day).timestamp()
-
-        matches = np.where(self.data['date'] <= timestamp)[0]
-        match_count = len(matches)
+        # binary search for the number of rows up till this date
+        match_count = np.searchsorted(self.get_date_ordinals(),
+                                      date.toordinal(), side='right')
 
         # no matching rows
         if match_count == 0:
@@ -133,7 +236,7 @@ class Instrument(object):
 
         else:
             # get the index of the last matching row
-            row_index = matches[-1]
+            row_index = int(match_count) - 1
             return row_index
 
     def get_day(self, date):
@@ -165,21 +268,14 @@ class Instrument(object):
         Raises:
            KeyError if there is no data for this or later dates
         """
-        # convert to timestamp
-        timestamp = datetime.datetime(
-            date.year, date.month, date.day).timestamp()
-
-        # get matching rows
-        matches = np.where(self.data['date'] >= timestamp)[0]
-        match_count = len(matches)
+        # binary search for the first row at or after this date
+        row_index = int(np.searchsorted(self.get_date_ordinals(),
+                                        date.toordinal(), side='left'))
 
         # no matching rows
-        if match_count == 0:
+        if row_index == len(self.data):
             raise KeyError("Date not found :" + str(date))
         else:
-            # get the index of the first matching row
-            row_index = matches[0]
-
             return self._get_row(row_index)
 
     def get_day_or_last_before(self, date):
@@ -195,20 +291,16 @@ class Instrument(object):
         Raises:
            KeyError if there is no data for this or previous dates
         """
-        # convert to timestamp
-        timestamp = datetime.datetime(
-            date.year, date.month, date.day).timestamp()
-
-        # get matching rows
-        matches = np.where(self.data['date'] <= timestamp)[0]
-        match_count = len(matches)
+        # binary search for the number of rows up till this date
+        match_count = np.searchsorted(self.get_date_ordinals(),
+                                      date.toordinal(), side='right')
 
         # no matching rows
         if match_count == 0:
             raise KeyError("Date not found :" + str(date))
         else:
             # get the index of the last matching row
-            row_index = matches[-1]
+            row_index = int(match_count) - 1
 
             return self._get_row(row_index)
 
@@ -237,11 +329,8 @@ class Instrument(object):
         # if this data belongs to an earlier date
         else:
 
-            # try to use the close price
-            try:
-                return day_data['close']
-            except:
-                return day_data['value']
+            # use the close price, or the value if it doesn't exist
+            return day_data[self.price_field]
 
     def existed_at_date(self, date):
         """
@@ -254,10 +343,10 @@ class Instrument(object):
 
         Return True or False
         """
-        first_date = self.get_first_date()
-        last_date = self.get_last_date()
+        dates = self.get_date_ordinals()
+        ordinal = date.toordinal()
 
-        if date < first_date or date > last_date:
+        if ordinal < dates[0] or ordinal > dates[-1]:
             return False
         else:
             return True
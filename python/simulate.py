@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import concurrent.futures
+import multiprocessing
 import sys
 import numpy as np
 import datetime
@@ -9,12 +11,29 @@ import datetime
 from historical_return_from_to_date import parse_date
 from markets import trading_days
 from markets import get_instrument
+from markets import get_instruments
 from strategy import Share
+from strategy import fill_orders
 from strategy import broker
 from plotting import LinkedPlot
 
 
-def simulate(strategy, money, from_date, to_date, reference):
+def run_simulation(strategy, money, from_date, to_date, reference, verbose=True):
+    """
+    Run a strategy on every trading day between two dates
+
+    Args:
+       strategy(strategy.Strategy): The strategy to run
+       money(float): Initial liquid assets
+       from_date(datetime.date): First day of the simulation
+       to_date(datetime.date): Last day of the simulation
+       reference(markets.Instrument): Instrument to compare against
+       verbose(bool): Print a summary of every day
+
+    Return:
+       Tuple (matrix, action_markers) where matrix is the daily log of the
+       account and action_markers is a list of tuple(date, str)
+    """
 
     # the number of shares we could have bought from the reference instrument
     reference_shares = money / reference.get_price(from_date)
@@ -37,7 +56,11 @@ def simulate(strategy, money, from_date, to_date, reference):
         # run the strategy for this date
         orders = strategy.execute(today, portfolio, money)
 
-        # process the orders
+        # the orders that get filled today, and their filled prices
+        filled_orders = []
+        filled_prices = []
+
+        # find out which orders get filled
         for order in orders:
 
             # get the instrument object
@@ -59,53 +82,58 @@ def simulate(strategy, money, from_date, to_date, reference):
 
             # try to fill orders
             elif order.action == 'buy':
-                if order.price is None:
-                    order.fill(average_price)
-                elif average_price <= order.price:
-                    order.fill(average_price)
-                money -= order.total
+                if order.price is None or average_price <= order.price:
+                    filled_orders.append(order)
+                    filled_prices.append(average_price)
             elif order.action == 'sell':
-                if order.price is None:
-                    order.fill(average_price)
-                elif average_price >= order.price:
-                    order.fill(average_price)
-                money += order.total
+                if order.price is None or average_price >= order.price:
+                    filled_orders.append(order)
+                    filled_prices.append(average_price)
             else:
                 raise Exception("Order.action is neither 'sell' nor 'buy'")
 
-            if order.filled:
+        # fill all of today's orders at once
+        fill_orders(filled_orders, filled_prices)
 
-                # update the action label for the plot
-                if action_label is None:
-                    action_label = ""
-                else:
-                    action_label += "\n"
-                action_label += order.action + " " + \
-                    order.ticker + " " + str(order.filled_price)
+        # process the filled orders
+        for order in filled_orders:
+
+            if order.action == 'buy':
+                money -= order.total
+            else:
+                money += order.total
 
-                # update the Share object if it exists for this ticker
-                try:
-                    share = portfolio[order.ticker]
+            # update the action label for the plot
+            if action_label is None:
+                action_label = ""
+            else:
+                action_label += "\n"
+            action_label += order.action + " " + \
+                order.ticker + " " + str(order.filled_price)
 
-                    # the new number of shares of this stock we own now
-                    if order.action == 'sell':
-                        new_quantity = share.quantity - order.quantity
-                    else:
-                        new_quantity = share.quantity + order.quantity
+            # update the Share object if it exists for this ticker
+            try:
+                share = portfolio[order.ticker]
 
-                        share.price = ((share.quantity * share.price) +
-                                       (order.quantity * order.filled_price)) / new_quantity
+                # the new number of shares of this stock we own now
+                if order.action == 'sell':
+                    new_quantity = share.quantity - order.quantity
+                else:
+                    new_quantity = share.quantity + order.quantity
 
-                    share.quantity = new_quantity
+                    share.price = ((share.quantity * share.price) +
+                                   (order.quantity * order.filled_price)) / new_quantity
 
-                    if new_quantity == 0:
-                        portfolio.pop(order.ticker)
+                share.quantity = new_quantity
 
-                except KeyError:
-                    # create a new share object
-                    share = Share(order.ticker, order.quantity,
-                                  order.filled_price)
-                    portfolio[order.ticker] = share
+                if new_quantity == 0:
+                    portfolio.pop(order.ticker)
+
+            except KeyError:
+                # create a new share object
+                share = Share(order.ticker, order.quantity,
+                              order.filled_price)
+                portfolio[order.ticker] = share
 
         interest = broker.calculate_interest(money)
         money += interest
@@ -140,11 +168,12 @@ def simulate(strategy, money, from_date, to_date, reference):
             action_markers.append((today, action_label))
 
         # print a message summary of today
-        print("%s: reference_value: %.0f, account_value: %.0f, money: %.0f, interest: %.0f" %
-              (str(today), reference_value, account_value, money, interest))
-        indent = len(str(today)) + 2
-        for order in orders:
-            print(' ' * indent + str(order))
+        if verbose:
+            print("%s: reference_value: %.0f, account_value: %.0f, money: %.0f, interest: %.0f" %
+                  (str(today), reference_value, account_value, money, interest))
+            indent = len(str(today)) + 2
+            for order in orders:
+                print(' ' * indent + str(order))
 
     matrix = np.array(strategy_log, dtype=[('date', 'O'),
                                            ('account_value', 'f8'),
@@ -153,18 +182,92 @@ def simulate(strategy, money, from_date, to_date, reference):
                                            ('loan_ratio', 'f8'),
                                            ('reference_value', 'f8')])
 
-    # create a plot showing the behavior of the strategy
-    plot = LinkedPlot(window_title=str(strategy))
+    return matrix, action_markers
+
+
+def _run_simulation_job(job):
+    """
+    Run a simulation in a worker process
+
+    Args:
+       job: Tuple of run_simulation() arguments, with the reference
+            instrument replaced by its ticker
+    """
+    strategy, money, from_date, to_date, reference_ticker = job
+    reference = get_instrument(reference_ticker)
+    return run_simulation(strategy, money, from_date, to_date, reference,
+                          verbose=False)
+
+
+def run_simulations(strategies, money, from_date, to_date, reference,
+                    max_workers=None):
+    """
+    Run several strategies in parallel, one worker process per strategy.
+    The strategies are independent of each other, so they scale with the
+    number of CPU cores.
+
+    Args:
+       strategies: List of strategy.Strategy objects
+       money(float): Initial liquid assets
+       from_date(datetime.date): First day of the simulation
+       to_date(datetime.date): Last day of the simulation
+       reference(markets.Instrument): Instrument to compare against
+       max_workers(int): Number of worker processes, None for all CPU cores
+
+    Return:
+       List of run_simulation() results in the same order as strategies
+    """
+    # Load the market data before the worker processes are started.
+    # Forked workers will then share it instead of loading the pickles again.
+    # Fork is only used on Linux, it isn't safe on macOS once system frameworks
+    # like Qt have started threads. Other start methods make every worker reload it.
+    get_instruments()
+    if sys.platform.startswith('linux'):
+        context = multiprocessing.get_context('fork')
+    else:
+        context = None
+
+    # pass the reference by ticker to avoid pickling its data for every job
+    jobs = [(strategy, money, from_date, to_date, reference.ticker)
+            for strategy in strategies]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers,
+                                                mp_context=context) as executor:
+        return list(executor.map(_run_simulation_job, jobs))
+
+
+def simulate(strategies, money, from_date, to_date, reference, max_workers=None):
+
+    # a single strategy is run in this process, printing what it does
+    if len(strategies) == 1:
+        results = [run_simulation(strategies[0], money,
+                                  from_date, to_date, reference)]
+    else:
+        results = run_simulations(strategies, money, from_date, to_date,
+                                  reference, max_workers)
+
+    # The subplots are named after the strategies. The same strategy can be
+    # run more than once, so number the names which aren't unique.
+    names = [str(s) for s in strategies]
+    names = [name + " " + str(i + 1) if names.count(name) > 1 else name
+             for i, name in enumerate(names)]
+
+    # create a plot showing the behavior of the strategies
+    plot = LinkedPlot(window_title=", ".join(names))
     plot.add_plot("Account value", title_above=False)
-    plot.add_subplot(matrix, "account_value", "Account value")
-    plot.add_subplot(matrix, "reference_value", str(reference))
 
-    for date, text in action_markers:
-        plot.add_marker(date,
-                        "Account value",
-                        "account_value",
-                        "Account value",
-                        text=text)
+    for name, (matrix, action_markers) in zip(names, results):
+        plot.add_subplot(matrix, "account_value", name)
+
+        for date, text in action_markers:
+            plot.add_marker(date,
+                            "Account value",
+                            "account_value",
+                            name,
+                            text=text)
+
+    # the reference value is the same for all strategies
+    plot.add_subplot(results[0][0], "reference_value", str(reference))
 
     plot.show()
 
@@ -173,26 +276,32 @@ if __name__ == "__main__":
 
     # parse command line arguments
     parser = argparse.ArgumentParser(description="Run a simulation")
-    parser.add_argument("strategy", help="The name of the strategy")
+    parser.add_argument("strategy", nargs='+',
+                        help="The name of the strategy, "
+                        "several strategies are run in parallel")
     parser.add_argument("money", help="Initial money")
     parser.add_argument("from_date", help="From date: YYYY-MM-DD")
     parser.add_argument("to_date", help="To date: YYYY-MM-DD")
     parser.add_argument("reference", help="Reference instrument (ex: OBX.OSE)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
     args = parser.parse_args()
 
-    # load the strategy class
+    # load the strategy classes
     import strategy
-    try:
-        strategy_class = getattr(strategy, args.strategy)
-    except AttributeError:
-        print('Could not import ' + args.strategy + ' from strategy')
-        print("Available strategies are:")
-
-        # print all items from the strategy module that end with "Strategy"
-        for attr in dir(strategy):
-            if attr.endswith("Strategy"):
-                print("   " + attr)
-                sys.exit(1)
+    strategy_classes = []
+    for strategy_name in args.strategy:
+        try:
+            strategy_classes.append(getattr(strategy, strategy_name))
+        except AttributeError:
+            print('Could not import ' + strategy_name + ' from strategy')
+            print("Available strategies are:")
+
+            # print all items from the strategy module that end with "Strategy"
+            for attr in dir(strategy):
+                if attr.endswith("Strategy"):
+                    print("   " + attr)
+            sys.exit(1)
 
     # parse the from/to dates
     from_date = parse_date(args.from_date)
@@ -200,11 +309,11 @@ if __name__ == "__main__":
 
     money = float(args.money)
 
-    # create the strategy instance
-    strategy = strategy_class(money, [], from_date, to_date)
+    # create the strategy instances
+    strategies = [c(money, [], from_date, to_date) for c in strategy_classes]
 
     # get the reference instument
     reference = get_instrument(args.reference.upper())
 
     # run the simulation
-    simulate(strategy, money, from_date, to_date, reference)
+    simulate(strategies, money, from_date, to_date, reference, args.workers)
@@ -1,3 +1,3 @@
-from ._classes import Order, Share
+from ._classes import Order, Share, fill_orders
 from ._randomstrategy import RandomStrategy
 from ._momentumstrategy import MomentumStrategy
\ No newline at end of file
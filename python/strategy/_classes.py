@@ -1,5 +1,4 @@
 from abc import ABCMeta, abstractmethod
-from copy import deepcopy
 import numpy as np
 import datetime
 
@@ -9,6 +8,10 @@ from . import broker
 class Order(object):
     """An order recommendation"""
 
+    # a fixed set of attributes makes the objects smaller and faster to access
+    __slots__ = ('ticker', 'action', 'quantity', 'price', 'filled',
+                 'filled_price', 'cost', 'brokerage', 'total', '_str_cache')
+
     def __init__(self, ticker, action, quantity, price=None):
         """
         Args:
@@ -24,43 +27,79 @@ class Order(object):
         self.filled = False
         self.filled_price = None
         self.cost = None
+        self.brokerage = None
+        self.total = None
+
+        # the string returned by __str__(), built on first use
+        self._str_cache = None
         
     def __str__(self):
-        s = "%s %d %s" % (self.action, self.quantity, self.ticker)
-        
+        if self._str_cache is None:
+            self._str_cache = self._build_str()
+        return self._str_cache
+
+    def _build_str(self):
         # check if self.price is defined
         if self.price is None:
-            s += ", market price"
+            price = "market price"
         else:
-            s += ", limit: " + str(round(self.price, 2))
+            price = f"limit: {self.price:.2f}"
 
         if self.filled:
-            s += ", filled: " + str(round(self.filled_price, 2))
-            s += ", cost: " + str(round(self.cost, 2))
-            s += ", brokerage: " + str(round(self.brokerage, 2))
-            s += ", total: " + str(round(self.total, 2))
+            status = (f"filled: {self.filled_price:.2f}, "
+                      f"cost: {self.cost:.2f}, "
+                      f"brokerage: {self.brokerage:.2f}, "
+                      f"total: {self.total:.2f}")
         else:
-            s += ", open"
-            
-        return s
+            status = "open"
+
+        # build the string in one go instead of appending to it
+        # the quantity is truncated to an integer, like "%d" does
+        return f"{self.action} {int(self.quantity)} {self.ticker}, {price}, {status}"
         
-    def fill(self, filled_price):
+    def fill(self, filled_price, brokerage=None):
         """
         Fill this order.
         Typically this function will be called by the simulator.
 
         Args:
            filled_price(float): The matched price for this order
+           brokerage(float): The brokerage fees, or None to calculate them
         """
         self.filled_price = filled_price
         self.filled = True
-        self.brokerage = broker.calculate_brokerage(self)
+        if brokerage is None:
+            brokerage = broker.calculate_brokerage(self)
+        self.brokerage = brokerage
         self.cost = self.quantity * self.filled_price
         self.total = self.cost + self.brokerage
 
+        # the string representation has changed
+        self._str_cache = None
+
+def fill_orders(orders, filled_prices):
+    """
+    Fill several orders at once.
+    The brokerage for all orders is calculated in one vectorized step.
+
+    Args:
+       orders: List of Order objects
+       filled_prices: List of the matched price for each order
+    """
+    quantities = np.fromiter((o.quantity for o in orders),
+                             dtype='f8', count=len(orders))
+    prices = np.asarray(filled_prices, dtype='f8')
+    brokerages = broker.calculate_brokerage_vec(quantities, prices)
+
+    for order, filled_price, brokerage in zip(orders, filled_prices,
+                                              brokerages.tolist()):
+        order.fill(filled_price, brokerage)
+
 class Share(object):
     """A share holding position"""
 
+    __slots__ = ('ticker', 'quantity', 'price')
+
     def __init__(self, ticker, quantity, price):
         """
         Args:
@@ -72,31 +111,38 @@ class Share(object):
         self.quantity = quantity
         self.price = price
 
-    def get_value(self, date):
+    def get_price(self, date):
         """
-        Get the closing value of an instrument at a given date
-        The closing value will be used if it exists,
+        Get the closing price of the instrument at a given date
+        The closing price will be used if it exists,
         otherwise the 'value' field will be used.
         Nasdaq OMX data typical doesn't have closing values.
 
         Args:
-           date(datetime.date): Date to get value for
+           date(datetime.date): Date to get the price for
 
         Return:
-           The monetary value of the asset
+           The price per share
         """
         instrument = markets.get_instrument(self.ticker)
         
         # if this date doesn't have any data, assume its worth the last known value
-        day_data = instrument.get_day_or_last_before(date)
+        row_index = instrument.get_day_index_or_last_before(date)
+
+        # the 'close' field if it exists, otherwise the 'value' field
+        return instrument.get_column(instrument.price_field)[row_index]
+
+    def get_value(self, date):
+        """
+        Get the closing value of the share holding at a given date
 
-        # preferably use the 'close' field, then the 'value' field
-        try:
-            current_price = day_data['close']
-        except KeyError:
-            current_price = day_data['value']
+        Args:
+           date(datetime.date): Date to get value for
 
-        return self.quantity * current_price
+        Return:
+           The monetary value of the asset
+        """
+        return self.quantity * self.get_price(date)
         
 class Strategy(object, metaclass=ABCMeta):
     """Base class for all strategies"""
@@ -116,9 +162,24 @@ class Strategy(object, metaclass=ABCMeta):
         self.money = money
         self.portfolio = portfolio
         self.today = from_date
+        self.today_ordinal = from_date.toordinal()
         self.from_date = from_date
         self.to_date = to_date
 
+        # truncated instruments for today, indexed by (ticker, date ordinal)
+        self._instrument_cache = {}
+
+        # the instruments returned by get_instruments() for today
+        self._instruments_cache = {}
+
+        # all tickers that ever existed, and their first and last dates as ordinals
+        self._tickers = np.array(markets.get_tickers())
+        instruments = [markets.get_instrument(t) for t in self._tickers]
+        self._first_dates = np.array(
+            [i.get_first_date().toordinal() for i in instruments], dtype='i8')
+        self._last_dates = np.array(
+            [i.get_last_date().toordinal() for i in instruments], dtype='i8')
+
     def __str__(self):
         """
         Return the name of the subclass
@@ -144,9 +205,14 @@ class Strategy(object, metaclass=ABCMeta):
            A list of Order objects
         """
         self.today = today
+        self.today_ordinal = today.toordinal()
         self.portfolio = portfolio
         self.money = money
 
+        # the truncated instruments from previous days are outdated
+        self._instrument_cache.clear()
+        self._instruments_cache.clear()
+
     def get_instrument(self, ticker):
         """
         Get an altered version of the instrument which only contains
@@ -156,18 +222,24 @@ class Strategy(object, metaclass=ABCMeta):
            ticker(str): Ticker name
         
         Return:
-           A deepcopied version of the Instrument object
+           A shallow copy of the Instrument object,
+           with a read-only view of the data
 
         Raises:
            ValueError: If the ticker doesn't exist for this date.
                        For instance when trying to get 'NAS.OSE'
                        and today's date is before 2003-12-18.
         """
-        # get a copy of the Instrument object which we can modify
-        instrument = deepcopy(markets.get_instrument(ticker))
+        # check if the instrument has already been truncated today
+        key = (ticker, self.today_ordinal)
+        if key in self._instrument_cache:
+            return self._instrument_cache[key]
+
+        instrument = markets.get_instrument(ticker)
+        dates = instrument.get_date_ordinals()
         
         # Check that this ticker existed at today's date
-        if not instrument.existed_at_date(self.today):
+        if not dates[0] <= self.today_ordinal <= dates[-1]:
             raise ValueError("'" + ticker + "' didn't exist at " + str(self.today) + \
                              ", first date: " + str(instrument.get_first_date()) + \
                              ", last date: " + str(instrument.get_last_date()))
@@ -175,34 +247,58 @@ class Strategy(object, metaclass=ABCMeta):
         # We already know that this date exists for this ticker.
         # If there is no date, it means there were no trades this date,
         # Therefore we will look for this date, or the last preceding date.
-        row_index = instrument.get_day_index_or_last_before(self.today)
+        row_index = np.searchsorted(dates, self.today_ordinal, side='right') - 1
 
-        # delete data which is into the future and the strategy now nothing of
-        instrument.data = np.delete(instrument.data, np.s_[row_index + 1:])
+        # hide data which is into the future and the strategy now nothing of
+        instrument = instrument.get_view(row_index + 1)
 
+        self._instrument_cache[key] = instrument
         return instrument
 
+    def get_prices(self, ticker, field=None, dtype=np.float32):
+        """
+        Get a price column of an instrument with data up till today.
+        float32 is the default to make scans over long histories faster.
+
+        Args:
+           ticker(str): Ticker name
+           field(str): Column name, None for the instrument's closing price
+           dtype: Type of the returned array
+
+        Return:
+           Read-only numpy.array
+
+        Raises:
+           ValueError: If the ticker doesn't exist for this date.
+        """
+        instrument = self.get_instrument(ticker)
+
+        if field is None:
+            field = instrument.price_field
+
+        # convert the full column only once, and slice it for today
+        column = markets.get_instrument(ticker).get_column(field, dtype)
+        return column[:len(instrument.data)]
+
     def get_instruments(self):
         """
         Get a list of instruments that exist at today's date
 
         Return:
-           Alphabetically sorted list of tickers
+           List of instruments, alphabetically sorted by ticker
         """
-        # All tickers that ever existed
-        all_instruments = markets.get_tickers()
-        
-        todays_instruments = []
-        for t in all_instruments:
+        # the list doesn't change during a day
+        today = self.today_ordinal
+        if today in self._instruments_cache:
+            return self._instruments_cache[today].copy()
+
+        # only include tickers which have data before and after today
+        mask = (self._first_dates <= today) & (today <= self._last_dates)
 
-            # If a ValueError is raised, it mean it exist today
-            try:
-                i = self.get_instrument(t)
-                todays_instruments.append(i)
-            except ValueError:
-                pass
+        todays_instruments = [self.get_instrument(t) for t in self._tickers[mask]]
 
-        return todays_instruments
+        self._instruments_cache[today] = todays_instruments
+        return todays_instruments.copy()
 
     def trading_days(self, from_date, to_date):
         """
@@ -215,7 +311,7 @@ class Strategy(object, metaclass=ABCMeta):
         Yields:
         datetime.date objects
         """
-        yield markets.trading_days(from_date, to_date)
+        yield from markets.trading_days(from_date, to_date)
 
     def trading_days_ago(self, days):
         """
@@ -2,9 +2,19 @@
 This file contains cost models for the stockbroker (bank)
 """
 
+import numpy as np
+
 # The minimum loan-to-value-ratio
 MIN_LOAN_TO_VALUE_RATIO = 0.5
 
+# Nordnet Mini
+BROKERAGE_MINIMUM = 49
+BROKERAGE_PERCENTAGE = 0.15
+
+# Nordnet Normal
+#BROKERAGE_MINIMUM = 99
+#BROKERAGE_PERCENTAGE = 0.049
+
 def calculate_interest(balance):
     """
     Calculate the interest for an account balance for 1 day
@@ -36,21 +46,27 @@ def calculate_brokerage(order):
     Return:
        Brokerage fees for filling the order
     """
-    # Nordnet Mini
-    minimum = 49
-    percentage = 0.15
-    
-    # Nordnet Normal
-    #minimum = 99
-    #percentage = 0.049
-
-    ratio = percentage / 100.0
+    ratio = BROKERAGE_PERCENTAGE / 100.0
     cost = ratio * order.quantity * order.filled_price
-    if cost < minimum:
-        cost = minimum
+    if cost < BROKERAGE_MINIMUM:
+        cost = BROKERAGE_MINIMUM
 
     return cost
 
+def calculate_brokerage_vec(quantities, prices):
+    """
+    Calculate the brokerage for several orders at once
+
+    Args:
+       quantities(numpy.array): The number of shares of each order
+       prices(numpy.array): The filled price of each order
+
+    Return:
+       numpy.array of brokerage fees for filling the orders
+    """
+    ratio = BROKERAGE_PERCENTAGE / 100.0
+    return np.maximum(ratio * quantities * prices, BROKERAGE_MINIMUM)
+
 def calculate_loan_ratio(account_value, portfolio_value):
     """ Calculate the loan-to-value ratio for an account
 
@@ -1,9 +1,32 @@
 # -*- coding: utf-8 -*-
 import scrapy
 import datetime
+import io
+import warnings
 import numpy as np
 
 
+def local_timestamps(dates):
+    """
+    Convert dates on the form YYYYMMDD to timestamps of local midnight,
+    the same as datetime.datetime(y, m, d).timestamp()
+
+    Args:
+       dates(numpy.array): Integer dates, for example 20170102
+
+    Return:
+       numpy.array of float timestamps
+    """
+    years = dates // 10000
+    months = dates // 100 % 100
+    days = dates % 100
+
+    # datetime takes care of the local UTC offset and daylight saving time
+    return np.fromiter((datetime.datetime(y, m, d).timestamp()
+                        for y, m, d in zip(years.tolist(), months.tolist(), days.tolist())),
+                       dtype='f8', count=len(dates))
+
+
 class NetfondsSpider(scrapy.Spider):
     name = 'netfonds'
     allowed_domains = ['netfonds.no']
@@ -102,46 +125,73 @@ class NetfondsSpider(scrapy.Spider):
         paper_type = response.meta['paper_type']
         exchange = response.meta['exchange']
 
-        # Split
-        lines = response.text.strip().split("\n")
-
-        # remove the first item, which is the column headers
-        header = lines.pop(0)
+        # Split off the first line, which is the column headers.
+        # The raw bytes are parsed directly, without decoding the whole body to str first.
+        header, _, body = response.body.strip().partition(b"\n")
 
         # sanity check: check that the header row is as expected
-        assert header == 'quote_date;paper;exch;open;high;low;close;volume;value'
-
-        # create an empty matrix to store the CSV data in
-        matrix = np.zeros(shape=len(lines),
-                          dtype=[('date', 'f8'),
-                                 ('open', 'f8'),
-                                 ('high', 'f8'),
-                                 ('low', 'f8'),
-                                 ('close', 'f8'),
-                                 ('volume', 'i8'),
-                                 ('value', 'i8')])
-
-        # fill in the data
-        for line_num, line in enumerate(lines):
-
-            # unpack row items)
-            (date, paper, exchange, open_price, high_price,
-             low_price, close_price, volume, value) = line.split(";")
-
-            # parse row items
-            date = datetime.datetime.strptime(date, '%Y%m%d').timestamp()
-            open_price = float(open_price)
-            high_price = float(high_price)
-            low_price = float(low_price)
-            close_price = float(close_price)
-            volume = float(volume)
-            value = float(value)
-
-            matrix[line_num] = date, open_price, high_price, low_price, \
-                close_price, volume, value
-
-        # sort rows on time column, there has been some swapped samples detected in the source
-        matrix = np.sort(matrix, order='date')
+        assert header == b'quote_date;paper;exch;open;high;low;close;volume;value'
+
+        # the columns of the matrix to store the CSV data in
+        dtype = [('date', 'f8'),
+                 ('open', 'f8'),
+                 ('high', 'f8'),
+                 ('low', 'f8'),
+                 ('close', 'f8'),
+                 ('volume', 'i8'),
+                 ('value', 'i8')]
+
+        # Parse all rows into a plain 2D array with one column per
+        # matrix column, skipping the paper and exchange columns.
+        # Malformed rows are reported below, so silence numpy's warnings.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            try:
+                # loadtxt parses in C, but fails on any malformed row
+                rows = np.loadtxt(io.BytesIO(body),
+                                  delimiter=';',
+                                  usecols=(0, 3, 4, 5, 6, 7, 8),
+                                  dtype='f8',
+                                  encoding=response.encoding)
+            except ValueError:
+                # Fall back to the slower genfromtxt, which is tolerant.
+                # Fields that can't be parsed will be NaN,
+                # and rows with too few fields are skipped.
+                rows = np.genfromtxt(io.BytesIO(body),
+                                     delimiter=';',
+                                     usecols=(0, 3, 4, 5, 6, 7, 8),
+                                     dtype='f8',
+                                     encoding=response.encoding,
+                                     invalid_raise=False)
+
+        rows = rows.reshape(-1, len(dtype))
+
+        # the number of rows that were skipped, counted without splitting the body
+        line_count = body.count(b"\n") + 1 if body else 0
+        skipped_count = line_count - len(rows)
+
+        # drop rows with missing or malformed values, including the dates
+        invalid = np.isnan(rows).any(axis=1)
+        invalid_count = skipped_count + np.count_nonzero(invalid)
+        if invalid_count:
+            self.logger.warning("%s: dropping %d malformed rows" %
+                                (ticker, invalid_count))
+            rows = rows[~invalid]
+
+        # Allocate the matrix.
+        # It doesn't need to be zeroed, every column is filled in below
+        matrix = np.empty(shape=len(rows), dtype=dtype)
+
+        # fill in the data with one bulk copy per column
+        matrix['date'] = local_timestamps(rows[:, 0].astype('i8'))
+        for index, (column, _) in enumerate(dtype[1:], start=1):
+            matrix[column] = rows[:, index]
+
+        # Sort rows on time column, there has been some swapped samples detected in the source.
+        # The rows are usually in order, so only sort if they aren't.
+        dates = matrix['date']
+        if not (dates[1:] >= dates[:-1]).all():
+            matrix = matrix[np.argsort(dates, kind='stable')]
 
         # print some info so that the user can see what's going on
         self.logger.info("Scraped " + ticker)